@@ -5,35 +5,63 @@ Downloads all Python files and saves them as markdown for easy reading.
 """
 
 import os
+import ast
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def get_github_tree(owner, repo, path="", ref="main"):
-    """Get file tree from GitHub API."""
-    url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/{ref}?recursive=1"
-    response = requests.get(url)
+try:
+    import orjson  # optional, much faster than the stdlib json module
+except ImportError:
+    orjson = None
+
+# Shared session so repeated requests to the same host reuse one
+# keep-alive connection instead of paying DNS + TCP + TLS every time
+session = requests.Session()
+
+# Downloads are network-bound, so fan them out over a bounded thread pool.
+# Kept below the session's default pool size (10) so connections are reused.
+MAX_WORKERS = 8
+
+# save_as_markdown writes "# path", a blank line and "```python" before the source
+MARKDOWN_HEADER_LINES = 3
+
+def get_github_tree(owner, repo, path="", ref="main", etag=None):
+    """Get file tree from GitHub API.
+    
+    Returns (files, etag). If etag still matches the tree, GitHub answers
+    304 Not Modified (which costs no API quota) and files is None.
+    """
+    # Ask for the "ref:path" subtree only, so the response lists the files
+    # under path instead of every file in the repository
+    tree_ish = f"{ref}:{path}" if path else ref
+    url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/{tree_ish}?recursive=1"
+    headers = {"If-None-Match": etag} if etag else {}
+    response = session.get(url, headers=headers)
+    if response.status_code == 304:
+        return None, etag
     response.raise_for_status()
     
     tree = response.json()["tree"]
-    # Filter for Python files in the specified path
+    # Subtree paths are relative to path; make them repo-relative again
+    prefix = f"{path}/" if path else ""
     files = [
-        item for item in tree 
-        if item["type"] == "blob" and 
-           item["path"].startswith(path) and 
-           item["path"].endswith(".py")
+        dict(item, path=prefix + item["path"])
+        for item in tree
+        if item["type"] == "blob" and item["path"].endswith(".py")
     ]
-    return files
+    return files, response.headers.get("ETag")
 
 def download_file(owner, repo, file_path, ref="main"):
-    """Download raw file content from GitHub."""
+    """Download raw file content from GitHub as bytes."""
     url = f"https://raw.githubusercontent.com/{owner}/{repo}/{ref}/{file_path}"
-    response = requests.get(url)
+    response = session.get(url)
     response.raise_for_status()
-    return response.text
+    return response.content
 
 def save_as_markdown(content, file_path, output_dir):
-    """Save Python content as markdown with proper formatting."""
+    """Save Python source bytes as markdown with proper formatting."""
     # Create a descriptive filename
     # src/agents/core/agent.py -> agents_core_agent.md
     parts = file_path.split('/')
@@ -43,62 +71,141 @@ def save_as_markdown(content, file_path, output_dir):
     filename = '_'.join(parts).replace('.py', '.md')
     output_path = Path(output_dir) / filename
     
-    # Create markdown content
-    markdown_content = f"""# {file_path}
+    # Wrap the raw bytes in a markdown header and footer and write them in
+    # one call, without decoding and re-encoding the source
+    header = f"# {file_path}\n\n```python\n".encode('utf-8')
+    with open(output_path, 'wb') as f:
+        f.write(header + content + b"\n```\n")
+    
+    return filename
 
-```python
-{content}
-```
-"""
+def index_classes(content):
+    """Find class definitions in Python source.
+    
+    Returns [{"name", "start", "end"}] with 1-based line numbers in the saved
+    markdown file, so the server can slice a class out without searching,
+    or None if the source cannot be parsed and the server has to scan it.
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        # Covers pathologically nested source as well as invalid syntax
+        return None
+    return [
+        {
+            "name": node.name,
+            "start": node.lineno + MARKDOWN_HEADER_LINES,
+            "end": node.end_lineno + MARKDOWN_HEADER_LINES
+        }
+        for node in ast.walk(tree)
+        if isinstance(node, ast.ClassDef)
+    ]
+
+def load_previous_index(index_path):
+    """Load the index written by the last run, if any.
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(markdown_content)
+    A missing, truncated or otherwise unreadable index is treated as empty,
+    so the run simply starts from scratch.
+    """
+    try:
+        if orjson:
+            index = orjson.loads(index_path.read_bytes())
+        else:
+            with open(index_path, 'r') as f:
+                index = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return index if isinstance(index, dict) else {}
+
+def save_index(index, index_path):
+    """Write the index as pretty-printed JSON.
     
-    return filename
+    The data goes to a temporary file that is then renamed over index_path,
+    so an interrupted run never leaves a half-written index behind.
+    """
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    if orjson:
+        tmp_path.write_bytes(orjson.dumps(index, option=orjson.OPT_INDENT_2))
+    else:
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=2)
+    os.replace(tmp_path, index_path)
 
-def main():
+def main(output_dir=Path(__file__).parent.parent / "data"):
     # Configuration
     owner = "openai"
     repo = "openai-agents-python"
     source_path = "src/agents"
-    output_dir = Path(__file__).parent.parent / "data"
+    
+    index_path = output_dir / "index.json"
     
     # Create output directory
     output_dir.mkdir(exist_ok=True)
     
+    # Reuse the previous run's ETag and blob SHAs, but only if it was
+    # for the same source; otherwise start from scratch
+    previous = load_previous_index(index_path)
+    if previous.get("source") != f"{owner}/{repo}" or previous.get("path") != source_path:
+        previous = {}
+    known_files = {f["original_path"]: f for f in previous.get("files", [])}
+    
+    # A 304 only says the tree is unchanged; skip the conditional request
+    # if any file from the last run has gone missing on disk or predates
+    # class indexing
+    etag = previous.get("etag")
+    if not all("classes" in f and (output_dir / f["saved_as"]).exists()
+               for f in known_files.values()):
+        etag = None
+    
     print(f"Downloading OpenAI Agents SDK from {owner}/{repo}...")
     
     # Get all Python files
-    files = get_github_tree(owner, repo, source_path)
+    files, etag = get_github_tree(owner, repo, source_path, etag=etag)
+    if files is None:
+        print("SDK unchanged since last download, nothing to do")
+        return
     print(f"Found {len(files)} Python files")
     
-    # Download and save each file
-    saved_files = []
-    for file_info in files:
+    def fetch_one(file_info):
+        """Download and save a single file, returning its index entry."""
         file_path = file_info["path"]
-        print(f"Downloading {file_path}...")
+        
+        # Skip files whose blob SHA matches what we already have on disk
+        # (entries from before class indexing are fetched again once)
+        known = known_files.get(file_path)
+        if (known and known.get("sha") == file_info["sha"] and "classes" in known
+                and (output_dir / known["saved_as"]).exists()):
+            return known
         
         try:
             content = download_file(owner, repo, file_path)
             saved_name = save_as_markdown(content, file_path, output_dir)
-            saved_files.append({
-                "original_path": file_path,
-                "saved_as": saved_name,
-                "size": len(content)
-            })
-            print(f"  → Saved as {saved_name}")
         except Exception as e:
-            print(f"  ✗ Error: {e}")
+            print(f"  ✗ {file_path}: {e}")
+            return None
+        print(f"  → {file_path} saved as {saved_name}")
+        return {
+            "original_path": file_path,
+            "saved_as": saved_name,
+            "size": len(content),
+            "sha": file_info["sha"],
+            "classes": index_classes(content)
+        }
     
-    # Save index
-    index_path = output_dir / "index.json"
-    with open(index_path, 'w') as f:
-        json.dump({
-            "source": f"{owner}/{repo}",
-            "path": source_path,
-            "files": saved_files,
-            "total_files": len(saved_files)
-        }, f, indent=2)
+    # Download and save files concurrently; map() keeps the tree order
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = executor.map(fetch_one, files)
+        saved_files = [entry for entry in results if entry is not None]
+    
+    # Save index; only keep the ETag if every file made it, so a failed
+    # download is retried next run instead of being hidden behind a 304
+    save_index({
+        "source": f"{owner}/{repo}",
+        "path": source_path,
+        "etag": etag if len(saved_files) == len(files) else None,
+        "files": saved_files,
+        "total_files": len(saved_files)
+    }, index_path)
     
     print(f"\nDownload complete! {len(saved_files)} files saved to {output_dir}")
     print(f"Index saved to {index_path}")
@@ -4,12 +4,23 @@ Simple MCP Server for OpenAI Agents SDK Reference
 """
 
 import os
+import re
 import json
+import string
+import shutil
+import subprocess
+from functools import lru_cache, partial
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 
 from fastmcp import FastMCP
 
+try:
+    import orjson  # optional, much faster than the stdlib json module
+except ImportError:
+    orjson = None
+
 # Initialize server
 mcp = FastMCP("OpenAI Agents SDK")
 
@@ -17,13 +28,286 @@ mcp = FastMCP("OpenAI Agents SDK")
 DATA_DIR = Path(__file__).parent.parent / "data"
 INDEX_FILE = DATA_DIR / "index.json"
 
+# ripgrep, if installed, is used for code search
+RG_PATH = shutil.which("rg")
+RG_TIMEOUT = 30  # seconds before giving up on ripgrep
+
+# Maps A-Z to a-z and leaves every other byte alone, so offsets are preserved
+ASCII_LOWER = bytes.maketrans(string.ascii_uppercase.encode(), string.ascii_lowercase.encode())
+
+# KELVIN SIGN and LONG S are the only non-ASCII characters that Unicode
+# simple case folding (which ripgrep's --ignore-case uses) maps to ASCII
+# letters, so an ASCII query must match them as "k" and "s" too
+ASCII_FOLDS = {'\u212a': 'k', '\u017f': 's'}
+ASCII_FOLD_BYTES = tuple(char.encode('utf-8') for char in ASCII_FOLDS)
+FOLD_TO_ASCII = str.maketrans(
+    string.ascii_uppercase + ''.join(ASCII_FOLDS),
+    string.ascii_lowercase + ''.join(ASCII_FOLDS.values()),
+)
+
 # Load index
+@lru_cache(maxsize=4)
+def _load_index(index_file: str, mtime_ns: int, size: int) -> dict:
+    """Parse index.json; memoized per (path, mtime, size) by load_index."""
+    if orjson:
+        with open(index_file, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(index_file, 'r') as f:
+        return json.load(f)
+
 def load_index():
-    """Load the file index."""
-    if INDEX_FILE.exists():
-        with open(INDEX_FILE, 'r') as f:
-            return json.load(f)
-    return {"files": []}
+    """Load the file index, re-parsing it only when index.json changes.
+    
+    The returned dict is shared between calls and must not be modified.
+    """
+    try:
+        st = os.stat(INDEX_FILE)
+        return _load_index(str(INDEX_FILE), st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return {"files": []}
+
+def data_version() -> tuple:
+    """
+    Fingerprint DATA_DIR cheaply for invalidating the in-memory caches.
+    
+    Adding or removing files changes the directory mtime, and download_sdk.py
+    rewrites index.json after every run that updates files, so two stats
+    notice any change the downloader makes, without a stat per file per query.
+    
+    A markdown file edited in place by hand changes neither, so search_code,
+    get_class and find_examples keep serving the old contents (and class
+    spans) until index.json is rewritten. get_source stats the one file it
+    reads and sees such an edit straight away.
+    """
+    version = []
+    for path in (DATA_DIR, INDEX_FILE):
+        try:
+            version.append(os.stat(path).st_mtime_ns)
+        except FileNotFoundError:
+            version.append(None)
+    return tuple(version)
+
+@lru_cache(maxsize=8)
+def _list_markdown_files(data_dir: str, version: tuple) -> tuple:
+    """Scan data_dir for markdown files; memoized per data_version()."""
+    # One os.scandir pass instead of Path.glob, which builds a Path and
+    # pattern-matches every directory entry
+    try:
+        with os.scandir(data_dir) as entries:
+            return tuple(sorted(
+                entry.name for entry in entries
+                if entry.name.endswith('.md') and entry.is_file()
+            ))
+    except FileNotFoundError:
+        return ()
+
+def list_markdown_files() -> List[str]:
+    """List saved SDK markdown file names in DATA_DIR, sorted by name."""
+    return list(_list_markdown_files(str(DATA_DIR), data_version()))
+
+@lru_cache(maxsize=8)
+def _class_locations(version: tuple) -> Dict[str, tuple]:
+    """Map class names to (saved_as, start, end) from the index; memoized per data_version()."""
+    locations = {}
+    for file_info in sorted(load_index().get("files", []), key=lambda f: f["saved_as"]):
+        for cls in file_info.get("classes") or []:
+            locations.setdefault(cls["name"], (file_info["saved_as"], cls["start"], cls["end"]))
+    return locations
+
+@lru_cache(maxsize=8)
+def _indexed_files(version: tuple) -> frozenset:
+    """Names of saved files the index has class spans for; memoized per data_version()."""
+    return frozenset(
+        file_info["saved_as"] for file_info in load_index().get("files", [])
+        if file_info.get("classes") is not None
+    )
+
+def rg_search(data_dir: str, query: str, case_sensitive: bool, max_per_file: int) -> Optional[Dict[str, List[str]]]:
+    """
+    Search the markdown files in data_dir with ripgrep.
+    
+    Returns matches in the same shape as openai_agents_search_code, or None
+    if ripgrep failed or timed out so the caller can fall back to the
+    Python search.
+    """
+    cmd = [
+        RG_PATH, "--fixed-strings", "--no-config", "--no-ignore", "--hidden",
+        "--max-depth", "1", "--glob", "*.md", "--max-count", str(max_per_file),
+        # One "path NUL line_number:text" record per matching line
+        "--with-filename", "--null", "--line-number", "--no-heading",
+        # Search files containing NUL bytes too, as the Python path does
+        "--text",
+    ]
+    if not case_sensitive:
+        cmd.append("--ignore-case")
+    cmd += ["--", query, data_dir]
+    
+    try:
+        proc = subprocess.run(cmd, capture_output=True, timeout=RG_TIMEOUT)
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    # Exit status 1 means no matches; anything above that is an error
+    if proc.returncode > 1:
+        return None
+    
+    results = {}
+    for record in proc.stdout.decode('utf-8', errors='replace').split('\n'):
+        if not record:
+            continue
+        path, _, rest = record.partition('\0')
+        line_number, _, text = rest.partition(':')
+        name = os.path.basename(path)
+        results.setdefault(name, []).append(f"Line {line_number}: {text.strip()}")
+    
+    # ripgrep searches files in parallel, so restore file name order
+    return dict(sorted(results.items()))
+
+def iter_matches(buf, find: Callable[[int], int]) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (line_number, stripped_line) for each line of buf with a match.
+    
+    find(pos) returns the offset of the next match at or after pos, or -1.
+    buf may be either text or bytes; matching lines are decoded lazily.
+    """
+    newline = '\n' if isinstance(buf, str) else b'\n'
+    line_number = 1
+    counted = 0  # line_number is correct up to this offset
+    pos = 0
+    
+    while pos < len(buf):
+        found = find(pos)
+        if found == -1:
+            return
+        
+        # Widen the match to its whole line
+        start = buf.rfind(newline, 0, found) + 1
+        end = buf.find(newline, found)
+        if end == -1:
+            end = len(buf)
+        
+        line_number += buf[counted:start].count(newline)
+        counted = start
+        
+        line = buf[start:end]
+        if not isinstance(line, str):
+            line = line.decode('utf-8', errors='replace')
+        yield line_number, line.strip()
+        pos = end + 1
+
+@lru_cache(maxsize=1024)
+def _read_bytes(path: str, version: tuple) -> bytes:
+    """Read a file; memoized per data_version() by read_file_bytes."""
+    with open(path, 'rb') as f:
+        return f.read()
+
+@lru_cache(maxsize=64)
+def _read_text(path: str, mtime_ns: int, size: int) -> str:
+    """Read a file as text; memoized per (path, mtime, size) by get_source."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def read_file_bytes(file_path: Path, version: tuple) -> bytes:
+    """
+    Return the contents of file_path, served from memory after the first read.
+    
+    version is the data_version() the caller saw, so no per-file stat is needed.
+    """
+    return _read_bytes(str(file_path), version)
+
+def regex_finder(buf, pattern) -> Callable[[int], int]:
+    """Adapt a compiled pattern to the find(pos) interface of iter_matches."""
+    def find(pos: int) -> int:
+        match = pattern.search(buf, pos)
+        return match.start() if match else -1
+    return find
+
+def search_content(content: bytes, query: str, case_sensitive: bool, max_matches: int) -> List[str]:
+    """
+    Return up to max_matches "Line N: text" entries for lines of content
+    containing query.
+    
+    The bytes are scanned in a single pass, so only matching lines are
+    ever decoded.
+    """
+    if case_sensitive:
+        pattern = re.compile(re.escape(query.encode('utf-8')))
+        matches = iter_matches(content, regex_finder(content, pattern))
+    elif query.isascii() and not any(char in content for char in ASCII_FOLD_BYTES):
+        # Lowercase once with translate, which keeps every offset in line
+        # with content, then use plain substring search; several times
+        # faster than an IGNORECASE regex
+        lowered = content.translate(ASCII_LOWER)
+        matches = iter_matches(content, partial(lowered.find, query.lower().encode('ascii')))
+    elif query.isascii():
+        # Same on decoded text, also folding the characters in ASCII_FOLDS
+        text = content.decode('utf-8', errors='replace')
+        folded = text.translate(FOLD_TO_ASCII)
+        matches = iter_matches(text, partial(folded.find, query.lower()))
+    else:
+        # Bytes can only be lowercased for ASCII, so search decoded text
+        text = content.decode('utf-8', errors='replace')
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
+        matches = iter_matches(text, regex_finder(text, pattern))
+    # Stop scanning as soon as enough matches have been found
+    return [f"Line {n}: {line}" for n, line in islice(matches, max_matches)]
+
+@lru_cache(maxsize=256)
+def _search_code(data_dir: str, version: tuple, query: str, case_sensitive: bool) -> Dict[str, List[str]]:
+    """Run a code search over data_dir; memoized per data_version()."""
+    if RG_PATH:
+        results = rg_search(data_dir, query, case_sensitive, max_per_file=10)
+        if results is not None:
+            return results
+    
+    results = {}
+    
+    # Search all markdown files
+    for name in _list_markdown_files(data_dir, version):
+        content = read_file_bytes(Path(data_dir) / name, version)
+        matches = search_content(content, query, case_sensitive, max_matches=10)
+        if matches:
+            results[name] = matches
+    
+    return results
+
+@lru_cache(maxsize=128)
+def example_pattern(topic: str) -> re.Pattern:
+    """
+    Compile the find_examples filter for topic: lines with a definition,
+    assignment, attribute access or the topic itself.
+    """
+    keywords = ['def ', 'class ', '= ', 'self.', topic.lower()]
+    return re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE)
+
+def extract_class(content: bytes, start: int, max_lines: int) -> List[str]:
+    """
+    Return up to max_lines lines of the class whose "class Name" line begins
+    at offset start, ending before the next line indented at or left of that
+    first line.
+    
+    Walks the bytes with find() rather than splitting the whole file, and only
+    decodes the lines that are returned.
+    """
+    class_info = []
+    indent_level = None
+    pos = start
+    
+    while pos <= len(content) and len(class_info) < max_lines:
+        end = content.find(b'\n', pos)
+        if end == -1:
+            end = len(content)
+        line = content[pos:end].rstrip(b'\r')  # Drop the \r of CRLF endings
+        stripped = line.lstrip()
+        indent = len(line) - len(stripped)
+        
+        if indent_level is None:
+            indent_level = indent  # The "class Name" line itself
+        elif stripped and indent <= indent_level:
+            break
+        class_info.append(line.decode('utf-8', errors='replace'))
+        pos = end + 1
+    
+    return class_info
 
 # --- Tools ---
 
@@ -64,11 +348,11 @@ def openai_agents_get_source(filename: str) -> str:
         openai_agents_get_source("agents_handoffs.md") - Get Handoff system code
     """
     file_path = DATA_DIR / filename
-    if not file_path.exists():
+    try:
+        st = os.stat(file_path)
+        return _read_text(str(file_path), st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
         return f"File not found: {filename}"
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return f.read()
 
 
 @mcp.tool()
@@ -89,28 +373,9 @@ def openai_agents_search_code(query: str, case_sensitive: bool = False) -> Dict[
     Returns:
         Dictionary mapping filenames to matching code lines (max 10 per file)
     """
-    results = {}
-    
-    # Convert query for case-insensitive search
-    if not case_sensitive:
-        query = query.lower()
-    
-    # Search all markdown files
-    for md_file in DATA_DIR.glob("*.md"):
-        matches = []
-        
-        with open(md_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            
-        for i, line in enumerate(lines, 1):
-            search_line = line if case_sensitive else line.lower()
-            if query in search_line:
-                matches.append(f"Line {i}: {line.strip()}")
-        
-        if matches:
-            results[md_file.name] = matches[:10]  # Limit to 10 matches per file
-    
-    return results
+    results = _search_code(str(DATA_DIR), data_version(), query, case_sensitive)
+    # Hand out copies so callers cannot modify the cached result
+    return {name: list(matches) for name, matches in results.items()}
 
 
 @mcp.tool()
@@ -141,37 +406,39 @@ def openai_agents_get_class(class_name: str) -> Optional[str]:
         openai_agents_get_class("Agent") - Get the Agent class implementation
         openai_agents_get_class("Tool") - Understand how tools are defined
     """
-    # Search for class definition
-    search_results = openai_agents_search_code(f"class {class_name}", case_sensitive=True)
-    
-    if not search_results:
-        return f"Class '{class_name}' not found"
+    # Slice the class straight out of its file using the line span that
+    # download_sdk.py recorded with ast
+    version = data_version()
+    location = _class_locations(version).get(class_name)
+    if location:
+        filename, start, end = location
+        end = min(end, start + 49)  # Return first 50 lines
+        try:
+            lines = read_file_bytes(DATA_DIR / filename, version).split(b'\n', end)
+        except FileNotFoundError:
+            pass
+        else:
+            # Drop the \r of CRLF line endings, as text-mode reads would
+            return b'\n'.join(
+                line.rstrip(b'\r') for line in lines[start - 1:end]
+            ).decode('utf-8', errors='replace')
     
-    # Get the first file with the class
-    for filename, matches in search_results.items():
-        content = openai_agents_get_source(filename)
-        
-        # Extract class definition and following lines
-        lines = content.split('\n')
-        class_info = []
-        in_class = False
-        indent_level = 0
-        
-        for line in lines:
-            if f"class {class_name}" in line:
-                in_class = True
-                indent_level = len(line) - len(line.lstrip())
-                class_info.append(line)
-            elif in_class:
-                current_indent = len(line) - len(line.lstrip())
-                if line.strip() and current_indent <= indent_level:
-                    break
-                class_info.append(line)
-        
-        if class_info:
-            return '\n'.join(class_info[:50])  # Return first 50 lines
+    # Fall back to scanning the files the index has no spans for (e.g. it
+    # predates class spans, or the file failed to parse). The name must be
+    # followed by "(", ":" or whitespace so "Age" does not match "Agent".
+    definition = re.compile(re.escape(f"class {class_name}".encode('utf-8')) + rb'[(:\s]')
+    indexed = _indexed_files(version)
+    for filename in _list_markdown_files(str(DATA_DIR), version):
+        if filename in indexed:
+            continue
+        content = read_file_bytes(DATA_DIR / filename, version)
+        match = definition.search(content)
+        if match:
+            start = content.rfind(b'\n', 0, match.start()) + 1
+            class_info = extract_class(content, start, max_lines=50)  # Return first 50 lines
+            return '\n'.join(class_info)
     
-    return f"Class '{class_name}' definition not found"
+    return f"Class '{class_name}' not found"
 
 
 @mcp.tool()
@@ -200,17 +467,14 @@ def openai_agents_find_examples(topic: str) -> Dict[str, List[str]]:
     results = openai_agents_search_code(topic, case_sensitive=False)
     
     # Filter and enhance results to show more context
+    looks_like_example = example_pattern(topic).search
     examples = {}
     for filename, matches in results.items():
         # Look for method definitions, class usage, etc.
-        enhanced_matches = []
-        for match in matches:
-            # Include matches that look like examples
-            if any(keyword in match.lower() for keyword in ['def ', 'class ', '= ', 'self.', topic.lower()]):
-                enhanced_matches.append(match)
+        enhanced_matches = list(islice(filter(looks_like_example, matches), 5))  # Top 5 examples per file
         
         if enhanced_matches:
-            examples[filename] = enhanced_matches[:5]  # Top 5 examples per file
+            examples[filename] = enhanced_matches
     
     return examples
 
@@ -220,5 +484,5 @@ def openai_agents_find_examples(topic: str) -> Dict[str, List[str]]:
 if __name__ == "__main__":
     print("OpenAI Agents SDK MCP Server")
     print(f"Data directory: {DATA_DIR}")
-    print(f"Files available: {len(list(DATA_DIR.glob('*.md')))}")
+    print(f"Files available: {len(list_markdown_files())}")
     mcp.run()
\ No newline at end of file
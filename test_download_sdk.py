@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Test the SDK downloader offline, against a fake GitHub"""
+
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+sys.path.append('src')
+
+import download_sdk
+
+print("Testing SDK downloader\n")
+
+
+class FakeResponse:
+    def __init__(self, status_code, json_data=None, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self._json = json_data
+
+    def json(self):
+        return self._json
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+failing = set()
+downloads = []
+
+def fake_get(url, headers=None, **kwargs):
+    """Serve a two-file tree with ETag "v1", failing downloads listed in failing."""
+    if "/git/trees/" in url:
+        if (headers or {}).get("If-None-Match") == '"v1"':
+            return FakeResponse(304)
+        tree = [{"type": "blob", "path": name, "sha": name} for name in ("a.py", "b.py")]
+        return FakeResponse(200, {"tree": tree}, headers={"ETag": '"v1"'})
+    file_path = "src/agents/" + url.rsplit("/", 1)[1]
+    downloads.append(file_path)
+    if file_path in failing:
+        return FakeResponse(500)
+    return FakeResponse(200, content=b"class A:\n    pass\n")
+
+
+with tempfile.TemporaryDirectory() as tmp, mock.patch.object(download_sdk.session, "get", fake_get):
+    output_dir = Path(tmp)
+    index_path = output_dir / "index.json"
+
+    # Test 1: A failed download is retried, not hidden behind a 304
+    print("1. Retrying failed downloads:")
+    failing.add("src/agents/b.py")
+    download_sdk.main(output_dir)
+    index = download_sdk.load_previous_index(index_path)
+    assert index["etag"] is None and len(index["files"]) == 1
+
+    # The missing file is fetched again; the unchanged one is skipped by SHA
+    failing.clear()
+    downloads.clear()
+    download_sdk.main(output_dir)
+    index = download_sdk.load_previous_index(index_path)
+    assert downloads == ["src/agents/b.py"]
+    assert index["etag"] == '"v1"' and len(index["files"]) == 2
+    print()
+
+    # Test 2: A deleted markdown file bypasses the 304
+    print("2. Restoring deleted files:")
+    (output_dir / "agents_a.md").unlink()
+    downloads.clear()
+    download_sdk.main(output_dir)
+    assert downloads == ["src/agents/a.py"] and (output_dir / "agents_a.md").exists()
+
+    # Nothing to do once everything is on disk
+    downloads.clear()
+    download_sdk.main(output_dir)
+    assert downloads == []
+    print()
+
+    # Test 3: A truncated index is ignored instead of aborting the run
+    print("3. Recovering from a half-written index:")
+    index_path.write_bytes(index_path.read_bytes()[:40])
+    assert download_sdk.load_previous_index(index_path) == {}
+    index_path.write_text("[]")
+    assert download_sdk.load_previous_index(index_path) == {}
+    downloads.clear()
+    download_sdk.main(output_dir)
+    assert sorted(downloads) == ["src/agents/a.py", "src/agents/b.py"]
+    assert len(download_sdk.load_previous_index(index_path)["files"]) == 2
+    assert not (output_dir / "index.json.tmp").exists()
+    print()
+
+# Test 4: Class spans point at lines of the saved markdown file
+print("4. Indexing class line spans:")
+source = b"class First:\n    pass\n\n\nclass Second:\n    a = 1\n    b = 2\n"
+classes = download_sdk.index_classes(source)
+print(f"   {classes}")
+assert classes == [
+    {"name": "First", "start": 4, "end": 5},
+    {"name": "Second", "start": 8, "end": 10},
+]
+with tempfile.TemporaryDirectory() as tmp:
+    saved = download_sdk.save_as_markdown(source, "src/agents/first.py", Path(tmp))
+    lines = (Path(tmp) / saved).read_text().split('\n')
+    assert lines[4 - 1] == "class First:" and lines[8 - 1] == "class Second:"
+
+# Source that cannot be parsed is marked for the server to scan
+assert download_sdk.index_classes(b"class Broken(:\n") is None
+assert download_sdk.index_classes(b"x = " + b"1+" * 200000 + b"1") is None
+print()
+
+# Test 5: An index from before class spans is upgraded despite its ETag
+print("5. Upgrading an index without class spans:")
+with tempfile.TemporaryDirectory() as tmp, mock.patch.object(download_sdk.session, "get", fake_get):
+    output_dir = Path(tmp)
+    index_path = output_dir / "index.json"
+    download_sdk.main(output_dir)
+    index = download_sdk.load_previous_index(index_path)
+    for entry in index["files"]:
+        del entry["classes"]
+    download_sdk.save_index(index, index_path)
+
+    downloads.clear()
+    download_sdk.main(output_dir)
+    index = download_sdk.load_previous_index(index_path)
+    assert sorted(downloads) == ["src/agents/a.py", "src/agents/b.py"]
+    assert all(entry["classes"] for entry in index["files"])
+print()
+
+print("✅ All tests passed!")
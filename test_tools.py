@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Test the MCP server tools against small generated data directories"""
+
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+sys.path.append('src')
+
+import download_sdk
+import server
+
+
+@contextmanager
+def data_dir(sources, indexed=True):
+    """
+    Save sources ({path: bytes}) the way download_sdk.py does and point the
+    server at them; the index gets class spans unless indexed is False.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        files = []
+        for file_path, content in sources.items():
+            entry = {
+                "original_path": file_path,
+                "saved_as": download_sdk.save_as_markdown(content, file_path, tmp),
+            }
+            if indexed:
+                entry["classes"] = download_sdk.index_classes(content)
+            files.append(entry)
+        download_sdk.save_index({"files": files}, tmp / "index.json")
+        with mock.patch.object(server, "DATA_DIR", tmp), \
+                mock.patch.object(server, "INDEX_FILE", tmp / "index.json"):
+            yield tmp
+
+
+print("Testing MCP server tools on generated data\n")
+
+# Test 1: get_class slices at most 50 lines out of a CRLF file by its span
+print("1. Slicing a class by its line span:")
+big = b"class Big:\r\n" + b"".join(b"    a%d = %d\r\n" % (i, i) for i in range(100))
+with data_dir({"src/agents/big.py": big}):
+    result = server.openai_agents_get_class("Big")
+print(f"   {len(result.splitlines())} lines")
+assert len(result.splitlines()) == 50
+assert result.startswith("class Big:\n    a0 = 0\n") and "\r" not in result
+print()
+
+# Test 2: Without class spans, get_class scans for the definition instead
+print("2. Scanning for a class without spans:")
+with data_dir({"src/agents/big.py": big}, indexed=False):
+    result = server.openai_agents_get_class("Big")
+print(f"   {len(result.splitlines())} lines")
+assert len(result.splitlines()) == 50
+assert result.startswith("class Big:\n    a0 = 0\n") and "\r" not in result
+print()
+
+# Test 3: Only exact class names match, and indexed files are not rescanned
+print("3. Matching whole class names:")
+agents = b"class Agent:\n    a = 1\n\nclass AgentHooks(Base):\n    b = 2\n"
+broken = b"class Broken(:\nclass Nested:\n    c = 3\nclass Age :\n    d = 4\n"
+with data_dir({"src/agents/agent.py": agents, "src/agents/broken.py": broken}):
+    assert server.openai_agents_get_class("Age") == "class Age :\n    d = 4\n"
+    assert server.openai_agents_get_class("Agent") == "class Agent:\n    a = 1"
+    assert server.openai_agents_get_class("Nested") == "class Nested:\n    c = 3"
+    assert server.openai_agents_get_class("Hooks") == "Class 'Hooks' not found"
+with data_dir({"src/agents/agent.py": agents}, indexed=False):
+    assert server.openai_agents_get_class("Agent") == "class Agent:\n    a = 1\n"
+    assert server.openai_agents_get_class("Age") == "Class 'Age' not found"
+print()
+
+# Test 4: Cached searches are dropped once the downloader rewrites the data
+print("4. Refreshing cached searches:")
+with data_dir({"src/agents/agent.py": agents}) as tmp:
+    assert server.openai_agents_search_code("zebra") == {}
+    with open(tmp / "agents_agent.md", 'ab') as f:
+        f.write(b"zebra = 1\n")
+    download_sdk.save_index(download_sdk.load_previous_index(tmp / "index.json"), tmp / "index.json")
+    assert list(server.openai_agents_search_code("zebra")) == ["agents_agent.md"]
+
+    download_sdk.save_as_markdown(b"zebra = 2\n", "src/agents/zoo.py", tmp)
+    assert list(server.openai_agents_search_code("zebra")) == ["agents_agent.md", "agents_zoo.md"]
+print()
+
+# Test 5: ripgrep and the Python search agree on the same files
+print("5. Comparing ripgrep with the Python search:")
+if shutil.which("rg") is None:
+    print("   skipped, rg is not installed")
+else:
+    sources = {
+        "src/agents/agent.py": agents,
+        "src/agents/crlf.py": b"class Crlf:\r\n    KEY = 'k'\r\n",
+        "src/agents/nul.py": b"key = '\x00'\nKey = 1\n",
+        "src/agents/fold.py": "kelvin = '\u212a'\nlong_s = '\u017f'\ncafé = 'CAFÉ'\n".encode('utf-8'),
+        "src/agents/many.py": b"".join(b"agent_%d = %d\n" % (i, i) for i in range(20)),
+    }
+    with data_dir(sources) as tmp, mock.patch.object(server, "RG_PATH", shutil.which("rg")):
+        version = server.data_version()
+        for query in ("k", "S", "agent", "Agent", "key", "café", "É", "nope"):
+            for case_sensitive in (False, True):
+                with_rg = server.rg_search(str(tmp), query, case_sensitive, max_per_file=10)
+                with mock.patch.object(server, "RG_PATH", None):
+                    in_python = server._search_code.__wrapped__(str(tmp), version, query, case_sensitive)
+                assert with_rg == in_python, (query, case_sensitive, with_rg, in_python)
+        print(f"   {server.rg_search(str(tmp), 'k', False, max_per_file=10)}")
+print()
+
+print("✅ All tests passed!")